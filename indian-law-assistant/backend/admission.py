@@ -0,0 +1,123 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_consume(self, now: float) -> float:
+        """
+        Take one token if available
+
+        Returns:
+            0.0 if a token was taken, otherwise the seconds until one is available
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Admission control for expensive search endpoints
+
+    Every search request must pass a per-client token bucket (keyed by API key
+    or IP) and find a free slot under the global in-flight limit. Requests that
+    do not are rejected immediately with a Retry-After hint instead of queueing,
+    so cheap endpoints are never stuck behind a backlog of searches.
+    """
+
+    def __init__(self, max_in_flight: int = 4, rate_per_client: float = 5.0,
+                 burst_per_client: float = 10.0, max_clients: int = 10000):
+        """
+        Initialize the admission controller
+
+        Args:
+            max_in_flight: Maximum number of concurrent search requests (0 disables the limit)
+            rate_per_client: Sustained search requests per second allowed per client (0 disables)
+            burst_per_client: Number of requests a client may burst above the sustained rate
+            max_clients: Number of client buckets kept before the least recently seen is dropped
+        """
+        self.max_in_flight = max_in_flight
+        self.rate_per_client = rate_per_client
+        self.burst_per_client = max(1.0, burst_per_client)
+        self.max_clients = max_clients
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # client key -> TokenBucket, in LRU order
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_overloaded = 0
+
+    def try_admit(self, client_key: str) -> Tuple[bool, Optional[str], int]:
+        """
+        Try to admit a search request
+
+        Returns:
+            Tuple of (admitted, rejection reason, Retry-After seconds)
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            # Check capacity first so clients are not charged a token for server overload
+            if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+                self.rejected_overloaded += 1
+                return False, "overloaded", 1
+
+            if self.rate_per_client > 0:
+                bucket = self._buckets.get(client_key)
+                if bucket is None:
+                    bucket = TokenBucket(self.rate_per_client, self.burst_per_client)
+                    self._buckets[client_key] = bucket
+                    if len(self._buckets) > self.max_clients:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(client_key)
+
+                wait = bucket.try_consume(now)
+                if wait > 0:
+                    self.rejected_rate_limited += 1
+                    return False, "rate_limited", max(1, math.ceil(wait))
+
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.admitted += 1
+            return True, None, 0
+
+    def release(self):
+        """Free the in-flight slot of a finished search request"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission counters for monitoring"""
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'max_in_flight': self.max_in_flight,
+                'rate_per_client': self.rate_per_client,
+                'burst_per_client': self.burst_per_client,
+                'tracked_clients': len(self._buckets),
+                'admitted': self.admitted,
+                'rejected_rate_limited': self.rejected_rate_limited,
+                'rejected_overloaded': self.rejected_overloaded
+            }
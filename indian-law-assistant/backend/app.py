@@ -1,11 +1,18 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import logging
 import time
 import os
+import asyncio
+import hmac
 from vector_store import get_vector_store, initialize_vector_store
+from profiling import SlowQueryLog, ProfilerCapture
+from admission import AdmissionController
 
 # Configure logging
 logging.basicConfig(
@@ -23,20 +30,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Pydantic models
 class QueryRequest(BaseModel):
     query: str = Field(..., description="Legal question or search query", min_length=1)
     top_k: int = Field(default=3, description="Number of results to return", ge=1, le=20)
     include_score: bool = Field(default=True, description="Include similarity scores in response")
+    debug: bool = Field(default=False, description="Include a per-stage timing breakdown in response")
 
 class SearchResult(BaseModel):
     rank: int
@@ -54,6 +53,7 @@ class QueryResponse(BaseModel):
     total_results: int
     processing_time: float
     timestamp: str
+    debug: Optional[Dict[str, Any]] = None
 
 class StatsResponse(BaseModel):
     total_documents: int
@@ -61,6 +61,7 @@ class StatsResponse(BaseModel):
     index_size: int
     source_files: List[str]
     document_types: Dict[str, int]
+    query_cache: Optional[Dict[str, Any]] = None
     status: str
 
 class HealthResponse(BaseModel):
@@ -72,6 +73,75 @@ class HealthResponse(BaseModel):
 # Global variables
 vector_store = None
 
+LOG_DIR = os.getenv("LOG_DIR", os.path.join(os.path.dirname(__file__), "logs"))
+slow_query_log = SlowQueryLog(
+    os.path.join(LOG_DIR, "slow-queries.log"),
+    threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500")),
+    sample_rate=float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+)
+profiler_capture = ProfilerCapture(os.path.join(LOG_DIR, "profiles"))
+
+admission_controller = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", str(os.cpu_count() or 4))),
+    rate_per_client=float(os.getenv("RATE_LIMIT_RPS", "5")),
+    burst_per_client=float(os.getenv("RATE_LIMIT_BURST", "10"))
+)
+
+# Endpoints that run embedding + FAISS search go through admission control;
+# everything else (health, stats, document listings) is a priority lane
+SEARCH_PATH_PREFIXES = ("/query", "/similar/")
+
+# Only issued keys get their own rate-limit bucket; otherwise a client could
+# mint a fresh bucket per request by sending made-up X-API-Key values
+API_KEYS = frozenset(key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip())
+
+def get_client_key(request: Request) -> str:
+    """Identify the client by a configured API key, falling back to the remote address"""
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in API_KEYS:
+        return f"key:{api_key}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    """Reject search requests early when the client or the server is over its limit"""
+    if not request.url.path.startswith(SEARCH_PATH_PREFIXES):
+        return await call_next(request)
+    
+    admitted, reason, retry_after = admission_controller.try_admit(get_client_key(request))
+    if not admitted:
+        if reason == "rate_limited":
+            status_code, detail = 429, "Rate limit exceeded"
+        else:
+            status_code, detail = 503, "Server is busy, too many searches in progress"
+        return JSONResponse(
+            status_code=status_code,
+            content={"error": detail, "status_code": status_code},
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    try:
+        return await call_next(request)
+    finally:
+        admission_controller.release()
+
+# CORS middleware (added last so it also wraps admission rejections)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, replace with specific origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+def get_vector_store_options() -> Dict[str, Any]:
+    """Read vector store tuning options from the environment"""
+    return {
+        "cache_size": int(os.getenv("QUERY_CACHE_SIZE", "512")),
+        "cache_ttl": float(os.getenv("QUERY_CACHE_TTL", "3600")),
+        "cache_threshold": float(os.getenv("QUERY_CACHE_THRESHOLD", "0.95"))
+    }
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the vector store on startup"""
@@ -79,7 +149,7 @@ async def startup_event():
     try:
         logger.info("Initializing vector store...")
         dataset_path = os.path.join(os.path.dirname(__file__), "dataset")
-        vector_store = initialize_vector_store(dataset_path)
+        vector_store = initialize_vector_store(dataset_path, **get_vector_store_options())
         logger.info("Vector store initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize vector store: {e}")
@@ -138,6 +208,7 @@ async def get_stats():
             index_size=stats["index_size"],
             source_files=stats["source_files"],
             document_types=stats["document_types"],
+            query_cache=stats.get("query_cache"),
             status="ready"
         )
     except Exception as e:
@@ -145,12 +216,13 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
 @app.post("/query", response_model=QueryResponse)
-async def query_legal_documents(request: QueryRequest):
+async def query_legal_documents(request: QueryRequest, x_debug_timing: Optional[str] = Header(default=None)):
     """
     Query legal documents using vector search
     
     This endpoint accepts a legal question and returns the most relevant 
-    sections from Indian legal documents.
+    sections from Indian legal documents. Set `debug` in the body or send an
+    `X-Debug-Timing: 1` header to get a per-stage timing breakdown.
     """
     global vector_store
     
@@ -158,12 +230,17 @@ async def query_legal_documents(request: QueryRequest):
         raise HTTPException(status_code=503, detail="Vector store not initialized")
     
     start_time = time.time()
+    debug = request.debug or (x_debug_timing or "").lower() in ("1", "true", "yes")
+    timings = {}
     
     try:
         logger.info(f"Processing query: {request.query}")
         
         # Search for relevant documents
-        results = vector_store.search(request.query, request.top_k)
+        results = await run_in_threadpool(
+            profiler_capture.run, vector_store.search, request.query, request.top_k, timings=timings
+        )
+        response_build_start = time.perf_counter()
         
         # Convert to response format
         search_results = []
@@ -180,18 +257,46 @@ async def query_legal_documents(request: QueryRequest):
             )
             search_results.append(search_result)
         
-        processing_time = time.time() - start_time
-        
         response = QueryResponse(
             query=request.query,
             results=search_results,
             total_results=len(search_results),
-            processing_time=round(processing_time, 3),
+            processing_time=0.0,
             timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
         )
         
-        logger.info(f"Query processed in {processing_time:.3f}s, returned {len(search_results)} results")
-        return response
+        cache_hit = timings.pop("cache_hit", False)
+        timings["response_build"] = round((time.perf_counter() - response_build_start) * 1000, 3)
+        response.processing_time = round(time.time() - start_time, 3)
+        
+        # Render the body here rather than after the handler returns so encoding is timed
+        serialise_start = time.perf_counter()
+        content = jsonable_encoder(response, exclude={"debug"})
+        rendered = JSONResponse(content=content)
+        timings["serialise"] = round((time.perf_counter() - serialise_start) * 1000, 3)
+        total_ms = (time.time() - start_time) * 1000
+        
+        slow_query_log.record(
+            request.query,
+            request.top_k,
+            total_ms,
+            timings,
+            index_generation=vector_store.generation,
+            cache_hit=cache_hit
+        )
+        
+        if debug:
+            # Debug output carries the serialise timing itself, so it is rendered once more
+            content["debug"] = {
+                "timings_ms": timings,
+                "total_ms": round(total_ms, 3),
+                "cache_hit": cache_hit,
+                "index_generation": vector_store.generation
+            }
+            rendered = JSONResponse(content=content)
+        
+        logger.info(f"Query processed in {total_ms / 1000:.3f}s, returned {len(search_results)} results")
+        return rendered
         
     except Exception as e:
         logger.error(f"Error processing query: {e}")
@@ -212,7 +317,9 @@ async def get_similar_sections(section: str, top_k: int = 3):
         raise HTTPException(status_code=503, detail="Vector store not initialized")
     
     try:
-        similar_sections = vector_store.get_similar_sections(section, top_k)
+        similar_sections = await run_in_threadpool(
+            profiler_capture.run, vector_store.get_similar_sections, section, top_k
+        )
         
         return {
             "section": section,
@@ -251,7 +358,7 @@ async def reload_vector_store(background_tasks: BackgroundTasks):
         try:
             logger.info("Reloading vector store...")
             dataset_path = os.path.join(os.path.dirname(__file__), "dataset")
-            vector_store = initialize_vector_store(dataset_path)
+            vector_store = initialize_vector_store(dataset_path, **get_vector_store_options())
             logger.info("Vector store reloaded successfully")
         except Exception as e:
             logger.error(f"Failed to reload vector store: {e}")
@@ -259,16 +366,74 @@ async def reload_vector_store(background_tasks: BackgroundTasks):
     background_tasks.add_task(reload_task)
     return {"message": "Vector store reload initiated in background"}
 
+def verify_admin_token(token: Optional[str]):
+    """Admin endpoints are only enabled when ADMIN_TOKEN is configured"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not hmac.compare_digest((token or "").encode("utf-8"), admin_token.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/stats/admission")
+async def get_admission_stats():
+    """Admission control and rate limiting counters for monitoring"""
+    return admission_controller.get_stats()
+
+@app.post("/admin/profile", status_code=202)
+async def start_profile_capture(duration: float = 30.0, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Capture a cProfile dump of the request handlers for a time window
+    
+    Args:
+        duration: Length of the capture window in seconds (1-300)
+    """
+    verify_admin_token(x_admin_token)
+    
+    if not 1 <= duration <= 300:
+        raise HTTPException(status_code=422, detail="duration must be between 1 and 300 seconds")
+    
+    if not profiler_capture.start(duration):
+        raise HTTPException(status_code=409, detail="A profiler capture is already running")
+    
+    asyncio.get_running_loop().call_later(duration, profiler_capture.stop)
+    
+    return {
+        "message": f"Profiler capture started for {duration}s",
+        "status": profiler_capture.get_status()
+    }
+
+@app.get("/admin/profile")
+async def get_profile_status(x_admin_token: Optional[str] = Header(default=None)):
+    """Show the running profiler capture, available dumps and slow-query log settings"""
+    verify_admin_token(x_admin_token)
+    
+    return {
+        "profiler": profiler_capture.get_status(),
+        "slow_query_log": {
+            "path": slow_query_log.log_path,
+            "threshold_ms": slow_query_log.threshold_ms,
+            "sample_rate": slow_query_log.sample_rate,
+            "logged": slow_query_log.logged
+        }
+    }
+
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     logger.error(f"HTTP error: {exc.status_code} - {exc.detail}")
-    return {"error": exc.detail, "status_code": exc.status_code}
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail, "status_code": exc.status_code},
+        headers=getattr(exc, "headers", None)
+    )
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unexpected error: {str(exc)}")
-    return {"error": "Internal server error", "status_code": 500}
+    return JSONResponse(
+        status_code=500,
+        content={"error": "Internal server error", "status_code": 500}
+    )
 
 if __name__ == "__main__":
     import uvicorn
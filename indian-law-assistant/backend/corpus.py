@@ -0,0 +1,481 @@
+"""
+Binary corpus format for the legal dataset
+
+`python corpus.py compile` walks every JSON file in the dataset once and
+writes a single binary corpus next to it. The vector store memory-maps that
+file on start instead of re-parsing JSON, and decodes fields lazily.
+
+Layout (little-endian):
+
+    header    magic, version, record/string/source counts, section offsets
+    sources   one row per source JSON file: interned name, size, mtime (staleness check)
+    strings   interned strings (types, parts, source files) as (offset, length) into the blob
+    records   fixed-size rows with (offset, length) pairs into the blob, interned ids
+              and a 16-byte content hash of the searchable text
+    blob      UTF-8 text; section, title and text are slices of the searchable text,
+              so each document's text is stored only once
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+import numpy as np
+from collections.abc import Sequence
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CORPUS_FILENAME = "corpus.lawc"
+CORPUS_MAGIC = b"LAWCORP1"
+CORPUS_VERSION = 1
+KEYWORD_SEPARATOR = "\x1f"
+
+HEADER_FORMAT = "<8sIIIIQQQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+SOURCE_DTYPE = np.dtype([
+    ('name_id', '<u4'),
+    ('size', '<u8'),
+    ('mtime_ns', '<i8'),
+])
+
+STRING_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('length', '<u4'),
+])
+
+RECORD_DTYPE = np.dtype([
+    ('search_offset', '<u8'), ('search_length', '<u4'),
+    ('section_offset', '<u8'), ('section_length', '<u4'),
+    ('title_offset', '<u8'), ('title_length', '<u4'),
+    ('text_offset', '<u8'), ('text_length', '<u4'),
+    ('keywords_offset', '<u8'), ('keywords_length', '<u4'),
+    ('type_id', '<u4'),
+    ('part_id', '<u4'),
+    ('source_id', '<u4'),
+    ('content_hash', 'V16'),
+])
+
+
+def iter_dataset_documents(dataset_path: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Yield (document, source_file) pairs from all JSON files in the dataset directory
+
+    Handles the different dataset structures: plain lists of documents,
+    the constitution's nested parts -> articles, and {'sections': [...]}.
+    """
+    for filename in sorted(os.listdir(dataset_path)):
+        if not filename.endswith('.json'):
+            continue
+
+        file_path = os.path.join(dataset_path, filename)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading {filename}: {e}")
+            continue
+
+        if isinstance(data, list):
+            # Direct list of documents
+            for item in data:
+                yield item, filename
+        elif isinstance(data, dict):
+            if 'parts' in data:
+                # Constitution: nested parts and articles
+                for part_data in data.get('parts', {}).values():
+                    if isinstance(part_data, dict) and 'articles' in part_data:
+                        for article_key, article_data in part_data['articles'].items():
+                            yield {
+                                'section': article_key,
+                                'title': article_data.get('title', ''),
+                                'text': article_data.get('content', ''),
+                                'part': part_data.get('title', ''),
+                                'type': 'constitution'
+                            }, filename
+            elif 'sections' in data:
+                for section in data['sections']:
+                    yield section, filename
+            else:
+                # Single document
+                yield data, filename
+
+
+def _normalise_keywords(keywords: Any) -> List[str]:
+    """Keywords may be a list or a single value; always return a list of strings"""
+    if not keywords:
+        return []
+    if isinstance(keywords, list):
+        return [str(keyword) for keyword in keywords if keyword not in (None, '')]
+    return [str(keywords)]
+
+
+def searchable_parts(document: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Return the (field, text) pieces that make up a document's searchable text, in order"""
+    parts = []
+
+    # Add section number/identifier
+    if document.get('section'):
+        parts.append(('section', str(document['section'])))
+
+    # Add title
+    if document.get('title'):
+        parts.append(('title', str(document['title'])))
+
+    # Add main text content
+    if document.get('text'):
+        parts.append(('text', str(document['text'])))
+
+    # Add keywords if available
+    parts.extend(('keywords', keyword) for keyword in _normalise_keywords(document.get('keywords')))
+
+    return parts
+
+
+def create_searchable_text(document: Dict[str, Any]) -> str:
+    """Create searchable text from document fields"""
+    return ' '.join(text for _, text in searchable_parts(document))
+
+
+def document_metadata(document: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    """
+    Normalise a dataset document into the metadata stored for each search result
+
+    Missing or null fields become empty strings (type defaults to 'legal') and
+    keywords are always a list of strings, so the JSON and compiled corpus
+    loaders produce identical metadata.
+    """
+    return {
+        'section': str(document.get('section') or ''),
+        'title': str(document.get('title') or ''),
+        'text': str(document.get('text') or ''),
+        'source_file': source_file,
+        'type': str(document.get('type') or 'legal'),
+        'part': str(document.get('part') or ''),
+        'keywords': _normalise_keywords(document.get('keywords'))
+    }
+
+
+def _source_fingerprints(dataset_path: str) -> Dict[str, Tuple[int, int]]:
+    """Size and mtime of every JSON file in the dataset, used to detect a stale corpus"""
+    fingerprints = {}
+    for filename in os.listdir(dataset_path):
+        if filename.endswith('.json'):
+            stat = os.stat(os.path.join(dataset_path, filename))
+            fingerprints[filename] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprints
+
+
+def compile_corpus(dataset_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Normalise all dataset JSON files into a binary corpus
+
+    Args:
+        dataset_path: Path to the dataset directory containing JSON files
+        output_path: Where to write the corpus (defaults to <dataset_path>/corpus.lawc)
+
+    Returns:
+        Path of the written corpus file
+    """
+    output_path = output_path or os.path.join(dataset_path, CORPUS_FILENAME)
+    fingerprints = _source_fingerprints(dataset_path)
+
+    strings = []
+    string_ids = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    blob = bytearray()
+    records = []
+
+    for document, source_file in iter_dataset_documents(dataset_path):
+        metadata = document_metadata(document, source_file)
+        row = {'search_offset': len(blob)}
+
+        # Write the searchable text once and point section/title/text into it
+        for i, (field, text) in enumerate(searchable_parts(document)):
+            if i:
+                blob += b' '
+            encoded = text.encode('utf-8')
+            if field != 'keywords':
+                row[f'{field}_offset'] = len(blob)
+                row[f'{field}_length'] = len(encoded)
+            blob += encoded
+        row['search_length'] = len(blob) - row['search_offset']
+        content_hash = hashlib.blake2b(
+            bytes(blob[row['search_offset']:]), digest_size=16
+        ).digest()
+
+        encoded = KEYWORD_SEPARATOR.join(metadata['keywords']).encode('utf-8')
+        row['keywords_offset'] = len(blob)
+        row['keywords_length'] = len(encoded)
+        blob += encoded
+
+        records.append((
+            row['search_offset'], row['search_length'],
+            row.get('section_offset', 0), row.get('section_length', 0),
+            row.get('title_offset', 0), row.get('title_length', 0),
+            row.get('text_offset', 0), row.get('text_length', 0),
+            row['keywords_offset'], row['keywords_length'],
+            intern(metadata['type']),
+            intern(metadata['part']),
+            intern(source_file),
+            content_hash
+        ))
+
+    sources = np.array(
+        [(intern(name), size, mtime_ns) for name, (size, mtime_ns) in sorted(fingerprints.items())],
+        dtype=SOURCE_DTYPE
+    )
+
+    # Interned strings live at the end of the blob
+    string_table = []
+    for value in strings:
+        encoded = value.encode('utf-8')
+        string_table.append((len(blob), len(encoded)))
+        blob += encoded
+
+    string_array = np.array(string_table, dtype=STRING_DTYPE)
+    record_array = np.array(records, dtype=RECORD_DTYPE)
+
+    sources_offset = HEADER_SIZE
+    strings_offset = sources_offset + sources.nbytes
+    records_offset = strings_offset + string_array.nbytes
+    blob_offset = records_offset + record_array.nbytes
+
+    header = struct.pack(
+        HEADER_FORMAT, CORPUS_MAGIC, CORPUS_VERSION,
+        len(record_array), len(string_array), len(sources),
+        sources_offset, strings_offset, records_offset, blob_offset
+    )
+
+    # Write to a temporary file first so a running server never maps a half-written corpus
+    temp_path = output_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(sources.tobytes())
+        f.write(string_array.tobytes())
+        f.write(record_array.tobytes())
+        f.write(blob)
+
+    try:
+        os.replace(temp_path, output_path)
+    except PermissionError:
+        # Windows refuses to replace a file that a running backend has memory-mapped
+        os.remove(temp_path)
+        raise PermissionError(
+            f"Cannot replace {output_path}; it is probably in use by a running backend. "
+            f"Stop the backend and compile again."
+        )
+
+    logger.info(f"Compiled {len(record_array)} documents from {len(sources)} files into {output_path}")
+    return output_path
+
+
+class CorpusReader:
+    """
+    Memory-mapped reader for a compiled binary corpus
+
+    The record table is a numpy view over the mapped file and text fields are
+    decoded from the blob only when accessed.
+    """
+
+    def __init__(self, corpus_path: str):
+        self.corpus_path = corpus_path
+
+        with open(corpus_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        try:
+            self._load_tables()
+        except Exception:
+            # Don't leave a truncated or foreign file mapped
+            self.close()
+            raise
+
+    def _load_tables(self):
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError(f"Not a compiled corpus (file too short): {self.corpus_path}")
+
+        (magic, version, record_count, string_count, source_count,
+         sources_offset, strings_offset, records_offset, blob_offset) = struct.unpack_from(
+            HEADER_FORMAT, self._mmap, 0
+        )
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"Not a compiled corpus: {self.corpus_path}")
+        if version != CORPUS_VERSION:
+            raise ValueError(f"Unsupported corpus version {version} in {self.corpus_path}")
+
+        self._sources = np.frombuffer(self._mmap, dtype=SOURCE_DTYPE,
+                                      count=source_count, offset=sources_offset)
+        string_table = np.frombuffer(self._mmap, dtype=STRING_DTYPE,
+                                     count=string_count, offset=strings_offset)
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE,
+                                     count=record_count, offset=records_offset)
+        self._blob_offset = blob_offset
+
+        # Interned strings are few, so decode them once
+        self.strings = [self._decode(int(offset), int(length)) for offset, length in string_table]
+
+    @property
+    def documents(self) -> 'CorpusDocuments':
+        """Searchable texts as a lazy sequence"""
+        # Wrappers are created on access rather than stored, so the reader has no
+        # reference cycle and its mapping is released as soon as the last user drops it
+        return CorpusDocuments(self)
+
+    @property
+    def metadata(self) -> 'CorpusMetadata':
+        """Record metadata as a lazy sequence"""
+        return CorpusMetadata(self)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def close(self):
+        """Release the memory mapping; the reader can no longer be used afterwards"""
+        if self._mmap is None:
+            return
+
+        # numpy views and the memoryview pin the mapping, so drop them first
+        self.records = None
+        self._sources = None
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a record view; the mapping is freed with it
+            logger.warning(f"Compiled corpus {self.corpus_path} is still referenced, deferring unmap")
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _decode(self, offset: int, length: int) -> str:
+        start = self._blob_offset + offset
+        return str(self._view[start:start + length], 'utf-8')
+
+    def _field(self, record, field: str) -> str:
+        return self._decode(int(record[f'{field}_offset']), int(record[f'{field}_length']))
+
+    def searchable_text(self, idx: int) -> str:
+        """Precomputed searchable text of a record"""
+        return self._field(self.records[idx], 'search')
+
+    def content_hash(self, idx: int) -> str:
+        """Hex content hash of a record's searchable text"""
+        return bytes(self.records[idx]['content_hash']).hex()
+
+    def get_metadata(self, idx: int) -> Dict[str, Any]:
+        """Decode the metadata dict of a record"""
+        record = self.records[idx]
+        keywords = self._field(record, 'keywords')
+        return {
+            'section': self._field(record, 'section'),
+            'title': self._field(record, 'title'),
+            'text': self._field(record, 'text'),
+            'source_file': self.strings[record['source_id']],
+            'type': self.strings[record['type_id']],
+            'part': self.strings[record['part_id']],
+            'keywords': keywords.split(KEYWORD_SEPARATOR) if keywords else []
+        }
+
+    def get_section_index(self) -> Dict[str, int]:
+        """Map lowercase section identifiers to the first record that has them"""
+        index = {}
+        for idx, (offset, length) in enumerate(zip(self.records['section_offset'].tolist(),
+                                                   self.records['section_length'].tolist())):
+            if length:
+                index.setdefault(self._decode(offset, length).lower(), idx)
+        return index
+
+    def get_type_counts(self) -> Dict[str, int]:
+        """Count records per document type without decoding any text"""
+        ids, counts = np.unique(self.records['type_id'], return_counts=True)
+        return {self.strings[type_id]: int(count) for type_id, count in zip(ids, counts)}
+
+    def get_source_files(self) -> List[str]:
+        """Source files that contributed at least one record"""
+        return [self.strings[source_id] for source_id in np.unique(self.records['source_id'])]
+
+    def is_stale(self, dataset_path: str) -> bool:
+        """Whether the dataset JSON files changed since the corpus was compiled"""
+        compiled = {
+            self.strings[source['name_id']]: (int(source['size']), int(source['mtime_ns']))
+            for source in self._sources
+        }
+        return compiled != _source_fingerprints(dataset_path)
+
+
+class CorpusDocuments(Sequence):
+    """Read-only list of searchable texts backed by a CorpusReader"""
+
+    def __init__(self, reader: CorpusReader):
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._reader.searchable_text(i) for i in range(*idx.indices(len(self)))]
+        return self._reader.searchable_text(idx)
+
+
+class CorpusMetadata(Sequence):
+    """Read-only list of metadata dicts backed by a CorpusReader"""
+
+    def __init__(self, reader: CorpusReader):
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._reader.get_metadata(i) for i in range(*idx.indices(len(self)))]
+        return self._reader.get_metadata(idx)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indian Law Assistant dataset tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", help="Compile dataset JSON into a binary corpus")
+    compile_parser.add_argument("dataset_path", nargs="?",
+                                default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset"),
+                                help="Dataset directory containing JSON files")
+    compile_parser.add_argument("-o", "--output", help=f"Output file (default: <dataset_path>/{CORPUS_FILENAME})")
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        if not os.path.isdir(args.dataset_path):
+            print(f"Dataset path does not exist: {args.dataset_path}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            output_path = compile_corpus(args.dataset_path, args.output)
+        except PermissionError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        with CorpusReader(output_path) as reader:
+            print(f"Compiled {len(reader)} documents into {output_path} "
+                  f"({os.path.getsize(output_path)} bytes)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import random
+import pstats
+import cProfile
+import threading
+import logging
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, Optional, List, Callable
+
+logger = logging.getLogger(__name__)
+
+class SlowQueryLog:
+    """
+    Sampled log of slow queries written as JSON lines to a rotating local file
+    """
+
+    def __init__(self, log_path: str, threshold_ms: float = 500.0, sample_rate: float = 1.0,
+                 max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3):
+        """
+        Initialize the slow-query log
+
+        Args:
+            log_path: Path of the log file (rotated as log_path.1, log_path.2, ...)
+            threshold_ms: Queries taking at least this long are candidates for logging
+            sample_rate: Fraction of slow queries that are actually written (0.0 - 1.0)
+            max_bytes: Size at which the log file is rotated
+            backup_count: Number of rotated files to keep
+        """
+        self.log_path = log_path
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.logged = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+
+        # Dedicated logger per file so slow-query records never end up in the console log
+        self._logger = logging.getLogger(f"{__name__}.slow_queries[{os.path.abspath(log_path)}]")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._logger.addHandler(handler)
+
+    def record(self, query: str, top_k: int, total_ms: float, timings_ms: Dict[str, float],
+               index_generation: Optional[int] = None, cache_hit: bool = False) -> bool:
+        """
+        Write a query to the log if it is slow and selected by sampling
+
+        Returns:
+            True if the query was written to the log
+        """
+        if total_ms < self.threshold_ms or random.random() >= self.sample_rate:
+            return False
+
+        entry = {
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'query': query,
+            'top_k': top_k,
+            'total_ms': round(total_ms, 3),
+            'timings_ms': timings_ms,
+            'index_generation': index_generation,
+            'cache_hit': cache_hit
+        }
+        self._logger.info(json.dumps(entry, ensure_ascii=False))
+        self.logged += 1
+        return True
+
+
+class ProfilerCapture:
+    """
+    On-demand cProfile capture for a fixed time window
+
+    Search work runs on threadpool workers, so instead of profiling a single
+    thread, calls made through run() while a capture is active are profiled
+    individually and merged when the capture stops. Only one call is profiled
+    at a time (others run unprofiled), which keeps the overhead bounded and
+    works with interpreters that allow a single active profiler.
+    Dumps are written in pstats format (readable by pstats, snakeviz, etc.).
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._active = False
+        self._samples = []
+        self._started_at = None
+        self._duration = None
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def start(self, duration: float) -> bool:
+        """Start a capture; returns False if one is already running"""
+        with self._lock:
+            if self._active:
+                return False
+            self._active = True
+            self._samples = []
+            self._started_at = time.time()
+            self._duration = duration
+        logger.info(f"Profiler capture started for {duration}s")
+        return True
+
+    def run(self, func: Callable, *args, **kwargs):
+        """Call func, profiling it if a capture is active and no other call is being profiled"""
+        if not self._active or not self._sample_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        try:
+            profiler = cProfile.Profile()
+            result = profiler.runcall(func, *args, **kwargs)
+            with self._lock:
+                if self._active:
+                    self._samples.append(profiler)
+            return result
+        finally:
+            self._sample_lock.release()
+
+    def stop(self) -> Optional[str]:
+        """Stop the running capture and dump it; returns the dump path"""
+        with self._lock:
+            if not self._active:
+                return None
+            self._active = False
+            samples = self._samples
+            self._samples = []
+
+        if not samples:
+            logger.info("Profiler capture finished without any profiled calls")
+            return None
+
+        stats = pstats.Stats(*samples)
+        os.makedirs(self.output_dir, exist_ok=True)
+        dump_path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        stats.dump_stats(dump_path)
+        logger.info(f"Profiler capture of {len(samples)} calls written to {dump_path}")
+        return dump_path
+
+    def get_status(self) -> Dict[str, Any]:
+        """Describe the running capture and list existing dumps"""
+        dumps: List[str] = []
+        if os.path.isdir(self.output_dir):
+            dumps = sorted(f for f in os.listdir(self.output_dir) if f.endswith('.prof'))
+
+        status = {
+            'active': self.active,
+            'pid': os.getpid(),
+            'output_dir': self.output_dir,
+            'dumps': dumps
+        }
+        if self.active:
+            status['started_at'] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started_at))
+            status['duration'] = self._duration
+        return status
@@ -0,0 +1,207 @@
+import re
+import time
+import threading
+import faiss
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Section/article numbers and the kind of provision they refer to. Queries that
+# differ only here ("Section 420 IPC" vs "Section 421 IPC") embed almost
+# identically, so they must match exactly before a cached result is reused.
+IDENTIFIER_PATTERN = re.compile(r"\b(?:\d+[a-z]*|sec(?:tion)?s?|art(?:icle)?s?|ipc|crpc|cpc)\b")
+IDENTIFIER_ALIASES = {
+    'sec': 'section', 'secs': 'section', 'sections': 'section',
+    'art': 'article', 'arts': 'article', 'articles': 'article'
+}
+
+def extract_identifiers(query: str) -> frozenset:
+    """Extract the identifier tokens (numbers, section/article, act abbreviations) of a query"""
+    tokens = IDENTIFIER_PATTERN.findall(query.lower())
+    return frozenset(IDENTIFIER_ALIASES.get(token, token) for token in tokens)
+
+class SemanticQueryCache:
+    """
+    Cache of recently answered queries keyed on embedding similarity.
+
+    Paraphrased questions ("punishment for theft", "what is the penalty for
+    stealing") land close together in embedding space, so a small FAISS index
+    over recent query embeddings lets us reuse an earlier result list instead
+    of searching the full document index again.
+    """
+
+    def __init__(self, dimension: int, max_entries: int = 512,
+                 ttl_seconds: float = 3600.0, similarity_threshold: float = 0.95):
+        """
+        Initialize the query cache
+
+        Args:
+            dimension: Dimension of the (L2 normalised) query embeddings
+            max_entries: Maximum number of cached queries before LRU eviction
+            ttl_seconds: Lifetime of a cached entry in seconds
+            similarity_threshold: Minimum cosine similarity for a cache hit
+        """
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self._entries = OrderedDict()  # entry id -> cached entry, in LRU order
+        self._next_id = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, query: str, query_embedding: np.ndarray, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return cached results for a query similar to the given one
+
+        A cached entry is only reused if it is within the similarity threshold
+        and mentions exactly the same section/article identifiers.
+
+        Args:
+            query: Query text, used to compare identifiers
+            query_embedding: Normalised query embedding of shape (1, dimension)
+            top_k: Number of results requested
+
+        Returns:
+            The cached result list truncated to top_k, or None on a miss
+        """
+        with self._lock:
+            if self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            identifiers = extract_identifiers(query)
+            k = min(self._index.ntotal, 8)
+            scores, ids = self._index.search(query_embedding.astype('float32'), k)
+
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id == -1 or score < self.similarity_threshold:
+                    break
+
+                entry = self._entries.get(int(entry_id))
+                if entry is None:
+                    continue
+
+                if now - entry['created_at'] > self.ttl_seconds:
+                    self._remove(int(entry_id))
+                    continue
+
+                # A cached list can only serve requests for as many results as it holds
+                if entry['top_k'] < top_k:
+                    continue
+
+                if entry['identifiers'] != identifiers:
+                    continue
+
+                self._entries.move_to_end(int(entry_id))
+                self.hits += 1
+                return [dict(result) for result in entry['results'][:top_k]]
+
+            self.misses += 1
+            return None
+
+    def store(self, query: str, query_embedding: np.ndarray, top_k: int,
+              results: List[Dict[str, Any]]):
+        """Add a freshly computed result list to the cache"""
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._index.add_with_ids(
+                query_embedding.astype('float32'),
+                np.array([entry_id], dtype='int64')
+            )
+            self._entries[entry_id] = {
+                'query': query,
+                'identifiers': extract_identifiers(query),
+                'top_k': top_k,
+                'results': [dict(result) for result in results],
+                'created_at': time.time()
+            }
+
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every cached entry, e.g. after the document index was rebuilt"""
+        with self._lock:
+            self._index.reset()
+            self._entries.clear()
+            self.invalidations += 1
+        logger.info("Query cache invalidated")
+
+    def _remove(self, entry_id: int):
+        """Remove a single entry from the index and the LRU table"""
+        self._index.remove_ids(np.array([entry_id], dtype='int64'))
+        self._entries.pop(entry_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and occupancy metrics for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'similarity_threshold': self.similarity_threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+# Paraphrases that should hit the cache, and near-misses that must not
+CALIBRATION_PARAPHRASES = [
+    ("punishment for theft", "what is the penalty for stealing"),
+    ("How to file an FIR?", "procedure for lodging an FIR with the police"),
+    ("What makes a valid contract?", "essentials of a valid contract"),
+    ("anticipatory bail", "how to get bail before arrest"),
+]
+CALIBRATION_NEAR_MISSES = [
+    ("Section 420 IPC", "Section 421 IPC"),
+    ("Article 14", "Article 15"),
+    ("punishment for theft", "punishment for robbery"),
+]
+
+def calibrate(model_name: str = "all-MiniLM-L6-v2"):
+    """Print cosine similarities of paraphrase and near-miss pairs for choosing a threshold"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    for label, pairs in (("paraphrase", CALIBRATION_PARAPHRASES), ("near-miss", CALIBRATION_NEAR_MISSES)):
+        for first, second in pairs:
+            embeddings = model.encode([first, second])
+            faiss.normalize_L2(embeddings)
+            similarity = float(np.dot(embeddings[0], embeddings[1]))
+            same_identifiers = extract_identifiers(first) == extract_identifiers(second)
+            print(f"{label:<10} {similarity:.3f}  identifiers match: {same_identifiers!s:<5}  "
+                  f"{first!r} / {second!r}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Semantic query cache tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = subparsers.add_parser(
+        "calibrate", help="Measure query similarities to choose QUERY_CACHE_THRESHOLD"
+    )
+    calibrate_parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Sentence transformer model")
+
+    args = parser.parse_args()
+    if args.command == "calibrate":
+        calibrate(args.model)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Backend modules are imported by name (e.g. `from corpus import ...`), as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep slow-query logs and profiler dumps written during tests out of backend/logs
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "indian-law-assistant-test-logs"))
@@ -0,0 +1,73 @@
+import pytest
+
+import admission
+from admission import TokenBucket, AdmissionController
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2.0, capacity=3.0)
+
+    assert [bucket.try_consume(bucket.updated_at) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_consume(bucket.updated_at) == pytest.approx(0.5)
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=1.0, capacity=2.0)
+    start = bucket.updated_at
+    bucket.try_consume(start)
+    bucket.try_consume(start)
+
+    assert bucket.try_consume(start + 1.0) == 0.0
+    assert bucket.try_consume(start + 1.0) > 0
+
+    # A long idle period never accumulates more than the burst capacity
+    assert bucket.try_consume(start + 100.0) == 0.0
+    assert bucket.tokens == pytest.approx(1.0)
+
+def test_rate_limit_is_per_client(clock):
+    controller = AdmissionController(max_in_flight=0, rate_per_client=1.0, burst_per_client=1.0)
+
+    assert controller.try_admit("ip:a") == (True, None, 0)
+    assert controller.try_admit("ip:a") == (False, "rate_limited", 1)
+    assert controller.try_admit("ip:b") == (True, None, 0)
+
+    clock[0] += 1.0
+    assert controller.try_admit("ip:a") == (True, None, 0)
+
+def test_in_flight_limit_and_release(clock):
+    controller = AdmissionController(max_in_flight=2, rate_per_client=0)
+
+    assert controller.try_admit("ip:a")[0]
+    assert controller.try_admit("ip:b")[0]
+    assert controller.try_admit("ip:c") == (False, "overloaded", 1)
+
+    controller.release()
+    assert controller.try_admit("ip:c")[0]
+
+    stats = controller.get_stats()
+    assert stats['in_flight'] == 2
+    assert stats['peak_in_flight'] == 2
+    assert stats['rejected_overloaded'] == 1
+
+def test_overload_rejection_does_not_consume_client_token(clock):
+    controller = AdmissionController(max_in_flight=1, rate_per_client=1.0, burst_per_client=2.0)
+
+    assert controller.try_admit("ip:a") == (True, None, 0)
+    assert controller.try_admit("ip:a") == (False, "overloaded", 1)
+
+    # Once the slot frees up, the retry still has the second burst token
+    controller.release()
+    assert controller.try_admit("ip:a") == (True, None, 0)
+    assert controller.get_stats()['rejected_rate_limited'] == 0
+
+def test_least_recently_seen_clients_are_dropped(clock):
+    controller = AdmissionController(max_in_flight=0, max_clients=2)
+
+    for client in ("ip:a", "ip:b", "ip:c"):
+        controller.try_admit(client)
+
+    assert controller.get_stats()['tracked_clients'] == 2
@@ -0,0 +1,130 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from admission import AdmissionController
+
+class StubVectorStore:
+    generation = 7
+
+    def search(self, query, top_k=5, timings=None, use_cache=True):
+        if timings is not None:
+            timings.update({"encode": 1.0, "cache_lookup": 0.1, "search": 2.0, "metadata": 0.2,
+                            "cache_hit": False})
+        return [{
+            "rank": 1,
+            "score": 0.9,
+            "section": "Section 378",
+            "title": "Theft",
+            "text": "Whoever, intending to take dishonestly any movable property...",
+            "source_file": "ipc.json",
+            "type": "ipc",
+            "part": None
+        }][:top_k]
+
+@pytest.fixture
+def client(monkeypatch):
+    # Startup is not run, so the embedding model is never loaded
+    monkeypatch.setattr(app_module, "vector_store", StubVectorStore())
+    monkeypatch.setattr(app_module, "admission_controller", AdmissionController(max_in_flight=0, rate_per_client=0))
+    return TestClient(app_module.app)
+
+def test_query_without_debug(client):
+    response = client.post("/query", json={"query": "punishment for theft", "top_k": 1})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_results"] == 1
+    assert body["results"][0]["section"] == "Section 378"
+    assert body.get("debug") is None
+
+@pytest.mark.parametrize("body_flag, headers", [
+    (True, {}),
+    (False, {"X-Debug-Timing": "1"}),
+])
+def test_query_debug_timings(client, body_flag, headers):
+    response = client.post("/query", json={"query": "punishment for theft", "debug": body_flag},
+                           headers=headers)
+
+    assert response.status_code == 200
+    debug = response.json()["debug"]
+    assert set(debug["timings_ms"]) == {"encode", "cache_lookup", "search", "metadata",
+                                        "response_build", "serialise"}
+    assert debug["cache_hit"] is False
+    assert debug["index_generation"] == 7
+    assert debug["total_ms"] >= 0
+
+def test_http_errors_are_json(client, monkeypatch):
+    monkeypatch.setattr(app_module, "vector_store", None)
+
+    response = client.post("/query", json={"query": "theft"})
+
+    assert response.status_code == 503
+    assert response.json() == {"error": "Vector store not initialized", "status_code": 503}
+
+def test_admin_disabled_without_token(client, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+
+    response = client.get("/admin/profile", headers={"X-Admin-Token": "anything"})
+
+    assert response.status_code == 403
+    assert response.json()["status_code"] == 403
+
+def test_admin_rejects_wrong_token(client, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+
+    assert client.get("/admin/profile").status_code == 401
+    assert client.get("/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get("/admin/profile", headers={"X-Admin-Token": "secret"}).status_code == 200
+
+@pytest.mark.parametrize("duration", [0, 301])
+def test_admin_profile_duration_bounds(client, monkeypatch, duration):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+
+    response = client.post("/admin/profile", params={"duration": duration},
+                           headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 422
+    assert "duration" in response.json()["error"]
+
+def test_admin_profile_conflict(client, monkeypatch, tmp_path):
+    from profiling import ProfilerCapture
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    capture = ProfilerCapture(str(tmp_path / "profiles"))
+    monkeypatch.setattr(app_module, "profiler_capture", capture)
+    capture.start(30)
+
+    response = client.post("/admin/profile", params={"duration": 5}, headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 409
+    capture.stop()
+
+def test_client_key_trusts_only_configured_api_keys(monkeypatch):
+    monkeypatch.setattr(app_module, "API_KEYS", frozenset({"issued-key"}))
+    client = TestClient(app_module.app)
+    seen = []
+    monkeypatch.setattr(app_module, "admission_controller", AdmissionController(max_in_flight=0, rate_per_client=0))
+    monkeypatch.setattr(app_module.admission_controller, "try_admit",
+                        lambda key: seen.append(key) or (False, "rate_limited", 1))
+
+    client.post("/query", json={"query": "theft"}, headers={"X-API-Key": "issued-key"})
+    client.post("/query", json={"query": "theft"}, headers={"X-API-Key": "made-up-key"})
+    client.post("/query", json={"query": "theft"})
+
+    assert seen == ["key:issued-key", "ip:testclient", "ip:testclient"]
+
+def test_spoofed_api_keys_share_the_ip_bucket(monkeypatch):
+    monkeypatch.setattr(app_module, "API_KEYS", frozenset())
+    monkeypatch.setattr(app_module, "vector_store", StubVectorStore())
+    monkeypatch.setattr(app_module, "admission_controller",
+                        AdmissionController(max_in_flight=0, rate_per_client=1, burst_per_client=2))
+    client = TestClient(app_module.app)
+
+    statuses = [
+        client.post("/query", json={"query": "theft"}, headers={"X-API-Key": f"fake-{i}"}).status_code
+        for i in range(4)
+    ]
+
+    assert statuses[:2] == [200, 200]
+    assert 429 in statuses[2:]
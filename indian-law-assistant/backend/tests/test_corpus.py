@@ -0,0 +1,140 @@
+import os
+import json
+import shutil
+import weakref
+import pytest
+
+from corpus import (
+    CorpusReader, compile_corpus, iter_dataset_documents,
+    create_searchable_text, document_metadata
+)
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+EDGE_CASE_DOCUMENTS = [
+    {'section': 'Section 1', 'title': 'Short title', 'text': 'This Act may be called...',
+     'type': 'test_act', 'keywords': ['short title', 'extent']},
+    {'section': 'Section 2', 'title': 'Definitions', 'text': 'In this Act...', 'keywords': 'definitions'},
+    {'section': 'Section 3', 'title': None, 'text': None, 'type': None, 'part': None, 'keywords': None},
+    {'section': 4, 'title': 'Numeric section', 'text': 'Text with ünïcödé and हिन्दी'},
+    {'title': 'No section at all', 'keywords': []},
+]
+
+def write_dataset(path, documents):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'test-act.json'), 'w', encoding='utf-8') as f:
+        json.dump(documents, f, ensure_ascii=False)
+
+def assert_round_trip(dataset_path, corpus_path):
+    expected = list(iter_dataset_documents(dataset_path))
+    with CorpusReader(corpus_path) as reader:
+        assert len(reader) == len(expected)
+        for idx, (document, source_file) in enumerate(expected):
+            assert reader.searchable_text(idx) == create_searchable_text(document)
+            assert reader.get_metadata(idx) == document_metadata(document, source_file)
+            assert reader.documents[idx] == create_searchable_text(document)
+            assert reader.metadata[idx] == document_metadata(document, source_file)
+
+def test_round_trip_shipped_dataset(tmp_path):
+    dataset_path = tmp_path / "dataset"
+    shutil.copytree(DATASET_PATH, dataset_path)
+
+    corpus_path = compile_corpus(str(dataset_path))
+
+    assert_round_trip(str(dataset_path), corpus_path)
+
+def test_round_trip_edge_cases(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+
+    corpus_path = compile_corpus(str(tmp_path))
+
+    assert_round_trip(str(tmp_path), corpus_path)
+    with CorpusReader(corpus_path) as reader:
+        assert reader.get_metadata(1)['keywords'] == ['definitions']
+        assert reader.get_metadata(2)['type'] == 'legal'
+        assert reader.get_metadata(2)['text'] == ''
+        assert reader.get_metadata(3)['section'] == '4'
+
+def test_document_metadata_normalises_fields():
+    metadata = document_metadata({'section': 'Section 3', 'text': None, 'type': None,
+                                  'keywords': 'definitions'}, 'test-act.json')
+
+    assert metadata == {
+        'section': 'Section 3', 'title': '', 'text': '', 'source_file': 'test-act.json',
+        'type': 'legal', 'part': '', 'keywords': ['definitions']
+    }
+
+def test_stats_helpers_and_section_index(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+
+    with CorpusReader(compile_corpus(str(tmp_path))) as reader:
+        assert reader.get_type_counts() == {'test_act': 1, 'legal': 4}
+        assert reader.get_source_files() == ['test-act.json']
+        assert reader.get_section_index() == {'section 1': 0, 'section 2': 1, 'section 3': 2, '4': 3}
+        assert len(reader.content_hash(0)) == 32
+
+def test_is_stale_after_dataset_changes(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+
+    with CorpusReader(compile_corpus(str(tmp_path))) as reader:
+        assert not reader.is_stale(str(tmp_path))
+
+        write_dataset(tmp_path, EDGE_CASE_DOCUMENTS[:2])
+        assert reader.is_stale(str(tmp_path))
+
+def test_is_stale_when_json_file_added(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+
+    with CorpusReader(compile_corpus(str(tmp_path))) as reader:
+        with open(tmp_path / 'new-act.json', 'w', encoding='utf-8') as f:
+            json.dump([], f)
+        assert reader.is_stale(str(tmp_path))
+
+def test_close_releases_mapping_and_allows_recompile(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+    reader = CorpusReader(compile_corpus(str(tmp_path)))
+
+    reader.close()
+    reader.close()  # closing twice is harmless
+
+    assert reader._mmap is None
+    compile_corpus(str(tmp_path))
+
+def test_rejects_non_corpus_file(tmp_path):
+    path = tmp_path / "not-a-corpus.lawc"
+    path.write_bytes(b"x" * 128)
+
+    with pytest.raises(ValueError):
+        CorpusReader(str(path))
+
+@pytest.mark.parametrize("size", [10, 60])
+def test_truncated_corpus_is_rejected_and_unmapped(tmp_path, monkeypatch, size):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+    corpus_path = compile_corpus(str(tmp_path))
+    with open(corpus_path, 'r+b') as f:
+        f.truncate(size)
+
+    closed = []
+    original_close = CorpusReader.close
+    monkeypatch.setattr(CorpusReader, "close", lambda self: closed.append(self) or original_close(self))
+
+    with pytest.raises(ValueError):
+        CorpusReader(corpus_path)
+
+    assert len(closed) == 1
+    assert closed[0]._mmap is None
+
+def test_reader_is_released_with_last_reference(tmp_path):
+    write_dataset(tmp_path, EDGE_CASE_DOCUMENTS)
+    reader = CorpusReader(compile_corpus(str(tmp_path)))
+    documents = reader.documents
+    reader_ref = weakref.ref(reader)
+
+    del reader
+    # The lazy sequences keep the mapping alive...
+    assert reader_ref() is not None
+    assert documents[0]
+
+    # ...and without reference cycles it is freed as soon as they go
+    del documents
+    assert reader_ref() is None
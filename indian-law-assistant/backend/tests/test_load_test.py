@@ -0,0 +1,88 @@
+import os
+import asyncio
+import importlib.util
+
+import httpx
+import pytest
+
+LOAD_TEST_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "load-test.py"
+)
+
+spec = importlib.util.spec_from_file_location("load_test", LOAD_TEST_PATH)
+load_test = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_test)
+
+class StubResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+def level(target_rps=10, throughput_rps=10, error_rate=0.0, p99=100.0):
+    return {
+        "target_rps": target_rps,
+        "throughput_rps": throughput_rps,
+        "error_rate": error_rate,
+        "latency_ms": {"p99": p99},
+    }
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert load_test.percentile(values, 50) == 50.0
+    assert load_test.percentile(values, 99) == 99.0
+    assert load_test.percentile(values, 100) == 100.0
+    assert load_test.percentile([7.0], 99) == 7.0
+    assert load_test.percentile([], 50) is None
+
+def test_not_saturated_within_slo():
+    assert load_test.is_saturated(level(), slo_p99_ms=500, max_error_rate=0.01) == (False, "")
+
+@pytest.mark.parametrize("overrides, reason", [
+    ({"error_rate": 0.05}, "error rate"),
+    ({"p99": 900.0}, "p99 latency"),
+    ({"throughput_rps": 8.0}, "throughput"),
+])
+def test_saturation_reasons(overrides, reason):
+    saturated, message = load_test.is_saturated(level(**overrides), slo_p99_ms=500, max_error_rate=0.01)
+
+    assert saturated
+    assert message.startswith(reason)
+
+def test_run_level_counts_statuses_errors_and_timeouts():
+    outcomes = iter(["ok", "server_error", "timeout", "connect_error", "ok"])
+
+    async def make_request(client):
+        outcome = next(outcomes)
+        if outcome == "timeout":
+            await asyncio.sleep(1)
+        if outcome == "connect_error":
+            raise httpx.ConnectError("refused")
+        return StubResponse(500 if outcome == "server_error" else 200)
+
+    result = asyncio.run(load_test.run_level(None, make_request, rps=50, duration=0.1, timeout=0.05))
+
+    assert result["requests"] == 5
+    assert result["status_codes"] == {"200": 2, "500": 1}
+    assert result["timeouts"] == 1
+    assert result["error_rate"] == pytest.approx(3 / 5)
+    assert result["latency_ms"]["p50"] is not None
+
+def test_run_level_dispatches_open_loop():
+    started = []
+
+    async def make_request(client):
+        started.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0.2)  # slower than the arrival interval
+        return StubResponse(200)
+
+    result = asyncio.run(load_test.run_level(None, make_request, rps=20, duration=0.25, timeout=1))
+
+    # All requests are sent on schedule even though none has completed yet
+    assert result["requests"] == 5
+    assert started[-1] - started[0] < 0.2 + 0.05
+    assert result["error_rate"] == 0.0
+
+def test_rps_levels_must_be_positive():
+    assert load_test.parse_rps_levels("1,2.5") == [1.0, 2.5]
+    with pytest.raises(Exception):
+        load_test.parse_rps_levels("0")
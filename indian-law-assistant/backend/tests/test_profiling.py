@@ -0,0 +1,74 @@
+import json
+import pstats
+
+from profiling import SlowQueryLog, ProfilerCapture
+
+def read_entries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_slow_query_log_threshold(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.log"), threshold_ms=100.0)
+
+    assert not log.record("fast query", 5, 99.9, {"search": 90.0})
+    assert log.record("slow query", 3, 150.0, {"encode": 20.0, "search": 120.0},
+                      index_generation=2, cache_hit=False)
+
+    entries = read_entries(log.log_path)
+    assert len(entries) == 1
+    assert log.logged == 1
+
+    entry = entries[0]
+    assert entry["query"] == "slow query"
+    assert entry["top_k"] == 3
+    assert entry["total_ms"] == 150.0
+    assert entry["timings_ms"] == {"encode": 20.0, "search": 120.0}
+    assert entry["index_generation"] == 2
+    assert entry["cache_hit"] is False
+    assert "timestamp" in entry
+
+def test_slow_query_log_sample_rate(tmp_path):
+    never = SlowQueryLog(str(tmp_path / "never.log"), threshold_ms=0.0, sample_rate=0.0)
+    always = SlowQueryLog(str(tmp_path / "always.log"), threshold_ms=0.0, sample_rate=1.0)
+
+    for _ in range(20):
+        assert not never.record("query", 5, 1000.0, {})
+        assert always.record("query", 5, 1000.0, {})
+
+    # Each log writes to its own file
+    assert never.logged == 0
+    assert len(read_entries(always.log_path)) == 20
+
+def test_profiler_capture_merges_calls(tmp_path):
+    capture = ProfilerCapture(str(tmp_path / "profiles"))
+
+    def work(n):
+        return sum(range(n))
+
+    # Calls outside a capture are not profiled
+    assert capture.run(work, 10) == 45
+    assert not capture.active
+
+    assert capture.start(30)
+    assert not capture.start(30)  # only one capture at a time
+    assert capture.get_status()["active"]
+
+    for n in (100, 200, 300):
+        assert capture.run(work, n) == sum(range(n))
+
+    dump_path = capture.stop()
+    assert dump_path is not None
+    assert not capture.active
+    assert capture.get_status()["dumps"] == [dump_path.rsplit("/", 1)[-1]]
+
+    stats = pstats.Stats(dump_path)
+    calls = [ncalls for (_, _, name), (_, ncalls, _, _, _) in stats.stats.items() if name == "work"]
+    assert calls == [3]
+
+def test_profiler_capture_without_calls_writes_nothing(tmp_path):
+    capture = ProfilerCapture(str(tmp_path / "profiles"))
+
+    assert capture.stop() is None
+    assert capture.start(30)
+    assert capture.stop() is None
+    assert capture.get_status()["dumps"] == []
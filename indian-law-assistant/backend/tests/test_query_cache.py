@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import query_cache
+from query_cache import SemanticQueryCache, extract_identifiers
+
+DIMENSION = 4
+
+def embedding(*values):
+    vector = np.array([values], dtype='float32')
+    return vector / np.linalg.norm(vector)
+
+def results(section, count=3):
+    return [{'rank': i + 1, 'section': section, 'score': 1.0} for i in range(count)]
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, 'time', lambda: now[0])
+    return now
+
+def test_similar_query_hits_and_truncates_to_top_k():
+    cache = SemanticQueryCache(DIMENSION, similarity_threshold=0.95)
+    cache.store("punishment for theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+
+    hit = cache.lookup("penalty for stealing", embedding(1, 0.1, 0, 0), 2)
+
+    assert [result['rank'] for result in hit] == [1, 2]
+    assert cache.get_stats()['hits'] == 1
+
+def test_dissimilar_query_misses():
+    cache = SemanticQueryCache(DIMENSION, similarity_threshold=0.95)
+    cache.store("punishment for theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+
+    assert cache.lookup("right to equality", embedding(0, 1, 0, 0), 3) is None
+    assert cache.get_stats()['misses'] == 1
+
+def test_larger_top_k_than_cached_misses():
+    cache = SemanticQueryCache(DIMENSION)
+    cache.store("punishment for theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+
+    assert cache.lookup("punishment for theft", embedding(1, 0, 0, 0), 5) is None
+
+def test_different_section_numbers_never_share_results():
+    cache = SemanticQueryCache(DIMENSION)
+    cache.store("Section 420 IPC", embedding(1, 0, 0, 0), 3, results("Section 420"))
+
+    assert cache.lookup("Section 421 IPC", embedding(1, 0, 0, 0), 3) is None
+    assert cache.lookup("Sec 420 IPC", embedding(1, 0, 0, 0), 3) is not None
+
+def test_extract_identifiers():
+    assert extract_identifiers("Article 14") == extract_identifiers("art 14")
+    assert extract_identifiers("Article 14") != extract_identifiers("Section 14")
+    assert extract_identifiers("Section 41 IPC") != extract_identifiers("Section 41 CrPC")
+    assert extract_identifiers("what is the penalty for stealing") == frozenset()
+
+def test_expired_entries_are_dropped(clock):
+    cache = SemanticQueryCache(DIMENSION, ttl_seconds=60)
+    cache.store("punishment for theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+
+    clock[0] += 30
+    assert cache.lookup("punishment for theft", embedding(1, 0, 0, 0), 3) is not None
+
+    clock[0] += 31
+    assert cache.lookup("punishment for theft", embedding(1, 0, 0, 0), 3) is None
+    assert cache.get_stats()['entries'] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticQueryCache(DIMENSION, max_entries=2)
+    cache.store("theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+    cache.store("equality", embedding(0, 1, 0, 0), 3, results("Article 14"))
+
+    # Touch "theft" so "equality" becomes the least recently used entry
+    assert cache.lookup("theft", embedding(1, 0, 0, 0), 3) is not None
+    cache.store("bail", embedding(0, 0, 1, 0), 3, results("Section 438"))
+
+    assert cache.lookup("theft", embedding(1, 0, 0, 0), 3) is not None
+    assert cache.lookup("equality", embedding(0, 1, 0, 0), 3) is None
+    assert cache.get_stats()['evictions'] == 1
+
+def test_invalidate_clears_entries():
+    cache = SemanticQueryCache(DIMENSION)
+    cache.store("theft", embedding(1, 0, 0, 0), 3, results("Section 379"))
+
+    cache.invalidate()
+
+    assert cache.lookup("theft", embedding(1, 0, 0, 0), 3) is None
+    assert cache.get_stats()['invalidations'] == 1
@@ -0,0 +1,89 @@
+import os
+import shutil
+import pytest
+
+import vector_store
+from corpus import CorpusReader, compile_corpus
+from vector_store import LegalVectorStore
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+def make_store(dataset_path):
+    """Load documents the way LegalVectorStore does, without the model or FAISS index"""
+    store = LegalVectorStore.__new__(LegalVectorStore)
+    store.dataset_path = dataset_path
+    store.documents = []
+    store.metadata = []
+    store.corpus = None
+    store.section_index = {}
+    store.query_cache = None
+    store.model_name = "test-model"
+    store.index = None
+    store.generation = 0
+    store._load_documents()
+    return store
+
+@pytest.fixture
+def dataset_path(tmp_path):
+    path = tmp_path / "dataset"
+    shutil.copytree(DATASET_PATH, path)
+    return str(path)
+
+def test_compiled_corpus_matches_json_loader(dataset_path):
+    json_store = make_store(dataset_path)
+    compile_corpus(dataset_path)
+    corpus_store = make_store(dataset_path)
+
+    assert corpus_store.corpus is not None
+    assert list(corpus_store.documents) == json_store.documents
+    assert list(corpus_store.metadata) == json_store.metadata
+    assert corpus_store.section_index == json_store.section_index
+
+    corpus_store.close()
+
+def test_stale_corpus_falls_back_to_json(dataset_path, monkeypatch):
+    compile_corpus(dataset_path)
+    os.utime(os.path.join(dataset_path, "contract-act.json"), ns=(0, 0))
+    readers = []
+    monkeypatch.setattr(vector_store, "CorpusReader", lambda path: readers.append(CorpusReader(path)) or readers[-1])
+
+    store = make_store(dataset_path)
+
+    assert store.corpus is None
+    assert len(store.documents) > 0
+    # The stale corpus is not left mapped
+    assert readers[0]._mmap is None
+
+def test_old_store_usable_after_reload(dataset_path, monkeypatch):
+    compile_corpus(dataset_path)
+    monkeypatch.setattr(vector_store, "LegalVectorStore", lambda path, **kwargs: make_store(path))
+    monkeypatch.setattr(vector_store, "vector_store", None)
+    old_store = vector_store.initialize_vector_store(dataset_path)
+    expected_stats = old_store.get_stats()
+    monkeypatch.setattr(old_store, "search", lambda text, top_k, use_cache=True: [
+        {'section': 'self'}, dict(old_store.metadata[0], section='other')])
+
+    new_store = vector_store.initialize_vector_store(dataset_path)
+
+    # Requests that started before the reload keep working against the old store
+    assert new_store is not old_store
+    assert old_store.corpus is not None
+    assert old_store.get_stats() == expected_stats
+    assert old_store.get_similar_sections("article 21", top_k=1)[0]['section'] == 'other'
+    assert old_store.documents[0] == new_store.documents[0]
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_similar_sections_uses_section_index(dataset_path, compiled, monkeypatch):
+    if compiled:
+        compile_corpus(dataset_path)
+    store = make_store(dataset_path)
+    searched = []
+    monkeypatch.setattr(store, "search", lambda text, top_k, use_cache=True: searched.append(
+        (text, top_k, use_cache)) or [{'section': 'self'}, {'section': 'other'}])
+
+    assert store.get_similar_sections("article 21", top_k=1) == [{'section': 'other'}]
+    assert searched[0][0].startswith("Article 21 ")
+    assert searched[0][1:] == (2, False)
+    assert store.get_similar_sections("Article 9999") == []
+
+    store.close()
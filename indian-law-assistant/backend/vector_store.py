@@ -1,26 +1,39 @@
 import os
-import json
+import time
+import itertools
 import faiss
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from sentence_transformers import SentenceTransformer
+from query_cache import SemanticQueryCache
+from corpus import (
+    CORPUS_FILENAME, CorpusReader, iter_dataset_documents,
+    create_searchable_text, document_metadata
+)
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Incremented every time an index is built, so logs can tell reloads apart
+_index_generations = itertools.count(1)
+
 class LegalVectorStore:
     """
     Vector store for Indian Legal Documents using FAISS and Sentence Transformers
     """
     
-    def __init__(self, dataset_path: str = "dataset/", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, dataset_path: str = "dataset/", model_name: str = "all-MiniLM-L6-v2",
+                 cache_size: int = 512, cache_ttl: float = 3600.0, cache_threshold: float = 0.95):
         """
         Initialize the vector store
         
         Args:
             dataset_path: Path to the dataset directory containing JSON files
             model_name: Sentence transformer model name for embeddings
+            cache_size: Maximum number of queries kept in the semantic query cache (0 disables it)
+            cache_ttl: Lifetime of a cached query result in seconds
+            cache_threshold: Minimum cosine similarity for a query to reuse cached results
         """
         self.dataset_path = dataset_path
         self.model_name = model_name
@@ -28,6 +41,13 @@ class LegalVectorStore:
         self.index = None
         self.documents = []
         self.metadata = []
+        self.corpus = None
+        self.section_index = {}
+        self.query_cache = None
+        self.generation = 0
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache_threshold = cache_threshold
         
         # Initialize the model and build index
         self._load_model()
@@ -45,109 +65,57 @@ class LegalVectorStore:
             raise
     
     def _load_documents(self):
-        """Load all JSON documents from the dataset directory"""
+        """Load documents from the compiled corpus, or from the JSON files if there is none"""
         logger.info(f"Loading documents from: {self.dataset_path}")
         
         if not os.path.exists(self.dataset_path):
             logger.error(f"Dataset path does not exist: {self.dataset_path}")
             return
         
-        document_count = 0
-        for filename in os.listdir(self.dataset_path):
-            if filename.endswith('.json'):
-                file_path = os.path.join(self.dataset_path, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Handle different JSON structures
-                    if isinstance(data, list):
-                        # Direct list of documents
-                        for item in data:
-                            self._process_document(item, filename)
-                            document_count += 1
-                    elif isinstance(data, dict):
-                        # Handle nested structure like constitution
-                        if 'parts' in data:
-                            self._process_constitution(data, filename)
-                            document_count += len(data.get('parts', {}))
-                        elif 'sections' in data:
-                            self._process_sections(data['sections'], filename)
-                            document_count += len(data['sections'])
-                        else:
-                            # Single document
-                            self._process_document(data, filename)
-                            document_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error loading {filename}: {e}")
-        
-        logger.info(f"Loaded {document_count} documents from {len(os.listdir(self.dataset_path))} files")
-    
-    def _process_constitution(self, data: Dict, source_file: str):
-        """Process constitution data with nested parts and articles"""
-        for part_key, part_data in data.get('parts', {}).items():
-            if isinstance(part_data, dict) and 'articles' in part_data:
-                for article_key, article_data in part_data['articles'].items():
-                    document = {
-                        'section': article_key,
-                        'title': article_data.get('title', ''),
-                        'text': article_data.get('content', ''),
-                        'part': part_data.get('title', ''),
-                        'type': 'constitution'
-                    }
-                    self._add_document(document, source_file)
-    
-    def _process_sections(self, sections: List[Dict], source_file: str):
-        """Process sections from legal documents"""
-        for section in sections:
-            self._process_document(section, source_file)
-    
-    def _process_document(self, item: Dict, source_file: str):
-        """Process individual document"""
-        self._add_document(item, source_file)
-    
-    def _add_document(self, document: Dict, source_file: str):
-        """Add a document to the store"""
-        # Create searchable text
-        searchable_text = self._create_searchable_text(document)
+        if self._load_compiled_corpus():
+            return
         
-        # Store document and metadata
-        self.documents.append(searchable_text)
-        self.metadata.append({
-            'section': document.get('section', ''),
-            'title': document.get('title', ''),
-            'text': document.get('text', ''),
-            'source_file': source_file,
-            'type': document.get('type', 'legal'),
-            'part': document.get('part', ''),
-            'keywords': document.get('keywords', [])
-        })
-    
-    def _create_searchable_text(self, document: Dict) -> str:
-        """Create searchable text from document fields"""
-        parts = []
+        source_files = set()
+        for document, source_file in iter_dataset_documents(self.dataset_path):
+            self._add_document(document, source_file)
+            source_files.add(source_file)
         
-        # Add section number/identifier
-        if document.get('section'):
-            parts.append(document['section'])
+        for idx, meta in enumerate(self.metadata):
+            if meta['section']:
+                self.section_index.setdefault(meta['section'].lower(), idx)
         
-        # Add title
-        if document.get('title'):
-            parts.append(document['title'])
+        logger.info(f"Loaded {len(self.documents)} documents from {len(source_files)} files")
+    
+    def _load_compiled_corpus(self) -> bool:
+        """Memory-map the compiled corpus if it exists and matches the JSON files"""
+        corpus_path = os.path.join(self.dataset_path, CORPUS_FILENAME)
+        if not os.path.exists(corpus_path):
+            return False
         
-        # Add main text content
-        if document.get('text'):
-            parts.append(document['text'])
+        try:
+            corpus = CorpusReader(corpus_path)
+        except Exception as e:
+            logger.error(f"Error loading compiled corpus {corpus_path}: {e}")
+            return False
         
-        # Add keywords if available
-        if document.get('keywords'):
-            if isinstance(document['keywords'], list):
-                parts.extend(document['keywords'])
-            else:
-                parts.append(str(document['keywords']))
+        if corpus.is_stale(self.dataset_path):
+            logger.warning(f"Compiled corpus {corpus_path} is out of date, loading JSON files instead "
+                           f"(run 'python corpus.py compile' to refresh it)")
+            corpus.close()
+            return False
         
-        return ' '.join(parts)
+        self.corpus = corpus
+        self.documents = corpus.documents
+        self.metadata = corpus.metadata
+        self.section_index = corpus.get_section_index()
+        logger.info(f"Loaded {len(corpus)} documents from compiled corpus {corpus_path}")
+        return True
+    
+    def _add_document(self, document: Dict, source_file: str):
+        """Add a document to the store"""
+        # Store searchable text and metadata
+        self.documents.append(create_searchable_text(document))
+        self.metadata.append(document_metadata(document, source_file))
     
     def _build_index(self):
         """Build FAISS index from documents"""
@@ -171,19 +139,32 @@ class LegalVectorStore:
             # Add embeddings to index
             self.index.add(embeddings.astype('float32'))
             
-            logger.info(f"Index built successfully with {self.index.ntotal} documents")
+            self.generation = next(_index_generations)
+            logger.info(f"Index built successfully with {self.index.ntotal} documents (generation {self.generation})")
+            
+            if self.cache_size > 0:
+                self.query_cache = SemanticQueryCache(
+                    dimension,
+                    max_entries=self.cache_size,
+                    ttl_seconds=self.cache_ttl,
+                    similarity_threshold=self.cache_threshold
+                )
             
         except Exception as e:
             logger.error(f"Error building index: {e}")
             raise
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query: str, top_k: int = 5,
+               timings: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         Search for relevant documents
         
         Args:
             query: Search query
             top_k: Number of top results to return
+            timings: Optional dict that receives per-stage timings in milliseconds
+                     ('encode', 'cache_lookup', 'search', 'metadata') and 'cache_hit'
+            use_cache: Whether to read from and add to the semantic query cache
             
         Returns:
             List of relevant documents with metadata and scores
@@ -193,27 +174,49 @@ class LegalVectorStore:
             return []
         
         try:
+            stage_start = time.perf_counter()
+            
             # Generate query embedding
             query_embedding = self.model.encode([query])
             faiss.normalize_L2(query_embedding)
+            stage_start = self._record_timing(timings, 'encode', stage_start)
+            
+            # Serve paraphrases of recently answered queries from the cache
+            if self.query_cache and use_cache:
+                cached_results = self.query_cache.lookup(query, query_embedding, top_k)
+                self._record_timing(timings, 'cache_lookup', stage_start)
+                if cached_results is not None:
+                    if timings is not None:
+                        timings['cache_hit'] = True
+                    logger.info(f"Cache hit: {len(cached_results)} results for query: {query}")
+                    return cached_results
+                stage_start = time.perf_counter()
             
             # Search
             scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
+            stage_start = self._record_timing(timings, 'search', stage_start)
             
             results = []
             for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
                 if idx != -1:  # Valid index
+                    meta = self.metadata[idx]
                     result = {
                         'rank': i + 1,
                         'score': float(score),
-                        'section': self.metadata[idx]['section'],
-                        'title': self.metadata[idx]['title'],
-                        'text': self.metadata[idx]['text'],
-                        'source_file': self.metadata[idx]['source_file'],
-                        'type': self.metadata[idx]['type'],
-                        'part': self.metadata[idx]['part']
+                        'section': meta['section'],
+                        'title': meta['title'],
+                        'text': meta['text'],
+                        'source_file': meta['source_file'],
+                        'type': meta['type'],
+                        'part': meta['part']
                     }
                     results.append(result)
+            self._record_timing(timings, 'metadata', stage_start)
+            if timings is not None:
+                timings['cache_hit'] = False
+            
+            if self.query_cache and use_cache:
+                self.query_cache.store(query, query_embedding, top_k, results)
             
             logger.info(f"Found {len(results)} results for query: {query}")
             return results
@@ -222,37 +225,60 @@ class LegalVectorStore:
             logger.error(f"Error during search: {e}")
             return []
     
+    @staticmethod
+    def _record_timing(timings: Optional[Dict[str, Any]], stage: str, stage_start: float) -> float:
+        """Store the time elapsed since stage_start (ms) and return the new stage start"""
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = round((now - stage_start) * 1000, 3)
+        return now
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store"""
         stats = {
             'total_documents': len(self.documents),
             'model_name': self.model_name,
             'index_size': self.index.ntotal if self.index else 0,
-            'source_files': list(set(meta['source_file'] for meta in self.metadata))
+            'index_generation': self.generation,
         }
         
-        # Count by type
-        type_counts = {}
-        for meta in self.metadata:
-            doc_type = meta['type']
-            type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
+        if self.corpus is not None:
+            # Answer from the record table without decoding every document
+            stats['source_files'] = self.corpus.get_source_files()
+            type_counts = self.corpus.get_type_counts()
+        else:
+            stats['source_files'] = list(set(meta['source_file'] for meta in self.metadata))
+            
+            # Count by type
+            type_counts = {}
+            for meta in self.metadata:
+                doc_type = meta['type']
+                type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
         
         stats['document_types'] = type_counts
+        stats['query_cache'] = self.query_cache.get_stats() if self.query_cache else None
         return stats
     
     def get_similar_sections(self, section: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Find similar sections to a given section"""
         # Find the section first
-        section_text = None
-        for i, meta in enumerate(self.metadata):
-            if meta['section'].lower() == section.lower():
-                section_text = self.documents[i]
-                break
+        idx = self.section_index.get(section.lower())
+        if idx is None:
+            return []
         
+        section_text = self.documents[idx]
         if not section_text:
             return []
         
-        return self.search(section_text, top_k + 1)[1:]  # Exclude the section itself
+        # Full section texts are not user queries, so keep them out of the query cache
+        return self.search(section_text, top_k + 1, use_cache=False)[1:]  # Exclude the section itself
+    
+    def close(self):
+        """Release resources held by the store, such as the compiled corpus mapping"""
+        if self.query_cache:
+            self.query_cache.invalidate()
+        if self.corpus is not None:
+            self.corpus.close()
 
 
 # Global vector store instance
@@ -265,8 +291,16 @@ def get_vector_store() -> LegalVectorStore:
         vector_store = LegalVectorStore()
     return vector_store
 
-def initialize_vector_store(dataset_path: str = "dataset/"):
+def initialize_vector_store(dataset_path: str = "dataset/", **kwargs):
     """Initialize the vector store with custom dataset path"""
     global vector_store
-    vector_store = LegalVectorStore(dataset_path)
+    old_store = vector_store
+    vector_store = LegalVectorStore(dataset_path, **kwargs)
+    
+    # Requests that started before the reload may still be using the old store, so it
+    # is not closed here; its corpus mapping is released once the last reference goes.
+    # Its cached results are no longer needed by new requests, though.
+    if old_store is not None and old_store.query_cache:
+        old_store.query_cache.invalidate()
+    
     return vector_store
\ No newline at end of file
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Load generator for Indian Law Assistant API
+Drives each endpoint open-loop at increasing request rates and writes a
+JSON report with throughput, latency percentiles, error rates and the
+saturation point per endpoint.
+
+Examples:
+    python load-test.py                          # against http://localhost:8000
+    python load-test.py --in-process             # ASGI transport, no network needed
+    python load-test.py --rps 5,10,20 --duration 15 --output report.json
+
+Per-client rate limiting caps a single load generator at RATE_LIMIT_RPS, so
+start the server (or the --in-process run) with RATE_LIMIT_RPS=0.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import quote
+
+import httpx
+
+API_BASE_URL = "http://localhost:8000"
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+# Realistic mix of user questions on top of the queries used by test-api.py
+EXTRA_QUERIES = [
+    "What is the punishment for theft?",
+    "what is the penalty for stealing",
+    "Explain fundamental rights in India",
+    "Right to equality provisions",
+    "Difference between murder and culpable homicide",
+    "Section 302 IPC punishment for murder",
+    "Section 498A cruelty by husband",
+    "defamation law in India",
+    "criminal intimidation punishment",
+    "How to file an FIR?",
+    "Can police arrest without warrant?",
+    "rights of an arrested person",
+    "Section 144 CrPC prohibitory orders",
+    "regular bail in non-bailable offences",
+    "maintenance of wife and children",
+    "What makes a valid contract?",
+    "Free consent in contract law",
+    "Remedies for breach of contract",
+    "What is coercion under the contract act?",
+    "agreement void for lack of consideration",
+    "Freedom of speech and expression",
+    "Right to education Article 21A",
+    "abolition of untouchability",
+    "Directive principles of state policy",
+    "Who is the President of India?",
+]
+
+# Section identifiers for the /similar endpoint
+SIMILAR_SECTIONS = [
+    "Article 14", "Article 19", "Article 21", "Article 32",
+    "Section 302", "Section 378", "Section 420", "Section 498A",
+    "Section 154", "Section 438", "Section 10", "Section 73",
+]
+
+def load_base_queries() -> List[str]:
+    """Reuse the query set from test-api.py"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-api.py")
+    try:
+        spec = importlib.util.spec_from_file_location("test_api", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return [query for query, _ in module.TEST_QUERIES]
+    except Exception as e:
+        print(f"⚠️  Could not load queries from test-api.py: {e}", file=sys.stderr)
+        return []
+
+def build_endpoints(top_k: int) -> Dict[str, Callable[[httpx.AsyncClient], Any]]:
+    """Build a request factory for each endpoint under test"""
+    queries = load_base_queries() + EXTRA_QUERIES
+
+    def query_request(client: httpx.AsyncClient):
+        payload = {"query": random.choice(queries), "top_k": top_k, "include_score": True}
+        return client.post("/query", json=payload)
+
+    def similar_request(client: httpx.AsyncClient):
+        section = quote(random.choice(SIMILAR_SECTIONS))
+        return client.post(f"/similar/{section}", params={"top_k": top_k})
+
+    def health_request(client: httpx.AsyncClient):
+        return client.get("/health")
+
+    return {
+        "/query": query_request,
+        "/similar/{section}": similar_request,
+        "/health": health_request,
+    }
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+async def run_level(client: httpx.AsyncClient, make_request: Callable, rps: float,
+                    duration: float, timeout: float) -> Dict[str, Any]:
+    """
+    Send requests open-loop at a fixed arrival rate
+
+    Requests are dispatched on schedule whether or not earlier ones have
+    completed, and latency is measured from the scheduled send time so that
+    queueing inside the server is not hidden (no coordinated omission).
+    """
+    total_requests = max(1, int(rps * duration))
+    latencies = []
+    status_counts = {}
+    errors = 0
+    timeouts = 0
+
+    async def send(scheduled_at: float):
+        nonlocal errors, timeouts
+        try:
+            response = await asyncio.wait_for(make_request(client), timeout=timeout)
+            key = str(response.status_code)
+            status_counts[key] = status_counts.get(key, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+        except asyncio.TimeoutError:
+            timeouts += 1
+            errors += 1
+        except httpx.HTTPError:
+            errors += 1
+        latencies.append(time.perf_counter() - scheduled_at)
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total_requests):
+        scheduled_at = start + i / rps
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(scheduled_at)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    successes = total_requests - errors
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+
+    return {
+        "target_rps": rps,
+        "requests": total_requests,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(successes / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total_requests, 4),
+        "timeouts": timeouts,
+        "status_codes": status_counts,
+        "latency_ms": {
+            "min": to_ms(latencies[0] if latencies else None),
+            "p50": to_ms(percentile(latencies, 50)),
+            "p90": to_ms(percentile(latencies, 90)),
+            "p95": to_ms(percentile(latencies, 95)),
+            "p99": to_ms(percentile(latencies, 99)),
+            "max": to_ms(latencies[-1] if latencies else None),
+        },
+    }
+
+def is_saturated(level: Dict[str, Any], slo_p99_ms: float, max_error_rate: float) -> Tuple[bool, str]:
+    """Decide whether a load level is past the service's capacity"""
+    if level["error_rate"] > max_error_rate:
+        return True, f"error rate {level['error_rate']:.2%} above {max_error_rate:.2%}"
+    p99 = level["latency_ms"]["p99"]
+    if p99 is not None and p99 > slo_p99_ms:
+        return True, f"p99 latency {p99}ms above SLO {slo_p99_ms}ms"
+    if level["throughput_rps"] < 0.9 * level["target_rps"]:
+        return True, f"throughput {level['throughput_rps']} rps below 90% of target"
+    return False, ""
+
+async def run_load_test(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    """Run every selected endpoint through every RPS level"""
+    endpoints = build_endpoints(args.top_k)
+    selected = args.endpoints or list(endpoints)
+    report = {
+        "target": "in-process" if args.in_process else args.base_url,
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "config": {
+            "rps_levels": args.rps,
+            "duration_seconds": args.duration,
+            "top_k": args.top_k,
+            "timeout_seconds": args.timeout,
+            "slo_p99_ms": args.slo_p99_ms,
+            "max_error_rate": args.max_error_rate,
+        },
+        "endpoints": {},
+    }
+
+    for name in selected:
+        print(f"🚀 Load testing {name}", file=sys.stderr)
+        levels = []
+        saturation = None
+
+        for rps in args.rps:
+            level = await run_level(client, endpoints[name], rps, args.duration, args.timeout)
+            saturated, reason = is_saturated(level, args.slo_p99_ms, args.max_error_rate)
+            level["saturated"] = saturated
+            levels.append(level)
+            print(f"   {rps:>7.1f} rps -> {level['throughput_rps']:>7.2f} rps, "
+                  f"p99 {level['latency_ms']['p99']}ms, errors {level['error_rate']:.2%}",
+                  file=sys.stderr)
+
+            if saturated:
+                saturation = {"target_rps": rps, "reason": reason}
+                if not args.keep_going:
+                    break
+
+        sustained = [level["target_rps"] for level in levels if not level["saturated"]]
+        report["endpoints"][name] = {
+            "levels": levels,
+            "max_sustained_rps": max(sustained) if sustained else None,
+            "saturation_point": saturation,
+        }
+
+    report["finished_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    return report
+
+async def main_async(args) -> Dict[str, Any]:
+    """Create the HTTP client (network or in-process) and run the test"""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    if not args.in_process:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+            return await run_load_test(client, args)
+
+    # Serve the FastAPI app directly over ASGI; handlers share this event loop
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app
+
+    # The lifespan context runs the app's startup and shutdown handlers
+    async with app.router.lifespan_context(app):
+        # Unhandled app exceptions become 500 responses instead of aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver",
+                                     limits=limits) as client:
+            return await run_load_test(client, args)
+
+def parse_rps_levels(value: str) -> List[float]:
+    """Parse a comma-separated list of positive request rates"""
+    try:
+        levels = [float(rps) for rps in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid RPS list: {value!r}")
+    if any(rps <= 0 for rps in levels):
+        raise argparse.ArgumentTypeError("RPS levels must be greater than 0")
+    return levels
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the Indian Law Assistant API")
+    parser.add_argument("--base-url", default=API_BASE_URL, help="API base URL")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run the app in-process over ASGI instead of the network")
+    parser.add_argument("--rps", default="1,2,5,10,20,50",
+                        type=parse_rps_levels,
+                        help="Comma-separated target request rates")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per RPS level")
+    parser.add_argument("--endpoints", nargs="+", choices=["/query", "/similar/{section}", "/health"],
+                        help="Endpoints to test (default: all)")
+    parser.add_argument("--top-k", type=int, default=3, help="top_k sent with search requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0, help="p99 latency SLO in ms")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Allowed error rate")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="Keep increasing load after the saturation point")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the query mix")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,17 @@ import sys
 
 API_BASE_URL = "http://localhost:8000"
 
+# Sample queries with the document type expected as the top match
+TEST_QUERIES = [
+    ("What is Article 21?", "constitution"),
+    ("Section 420 IPC", "ipc"),
+    ("How to file FIR", "crpc"),
+    ("What is a contract", "contract_act"),
+    ("fundamental rights", "constitution"),
+    ("theft punishment", "ipc"),
+    ("anticipatory bail", "crpc")
+]
+
 def test_health():
     """Test health endpoint"""
     print("🔍 Testing health endpoint...")
@@ -161,17 +172,7 @@ def main():
         tests_passed += 1
     
     # Query tests
-    test_queries = [
-        ("What is Article 21?", "constitution"),
-        ("Section 420 IPC", "ipc"),
-        ("How to file FIR", "crpc"),
-        ("What is a contract", "contract_act"),
-        ("fundamental rights", "constitution"),
-        ("theft punishment", "ipc"),
-        ("anticipatory bail", "crpc")
-    ]
-    
-    for query, expected_type in test_queries:
+    for query, expected_type in TEST_QUERIES:
         total_tests += 1
         if test_query(query, expected_type):
             tests_passed += 1